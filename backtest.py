@@ -3,6 +3,7 @@ import pandas as pd
 import pandas_ta as ta
 import matplotlib.pyplot as plt
 import logging
+from utils.results_store import load_run, save_run
 
 logging.basicConfig(
     level=logging.INFO,
@@ -182,47 +183,81 @@ def apply_smc_strategy(df, symbol, initial_balance):
 
     return balance, trade_history, equity_curve
 
+RUN_CONFIG = {**CONFIG, "initial_balance": INITIAL_BALANCE, "carryover_percent": CARRYOVER_PERCENT, "interval": INTERVAL, "strategy": "backtest"}
+
 results = {}
 equity_curves = {}
 balance = INITIAL_BALANCE
 
 try:
-    for symbol in SYMBOLS:
-        logger.info(f"Running backtest for {symbol} with starting balance {balance:.2f}")
-        final_balance, trade_history, equity_curve = apply_smc_strategy(historical_data[symbol], symbol, balance)
-        wins = len([t for t in trade_history if t['type'] == 'win'])
-        losses = len([t for t in trade_history if t['type'] == 'loss'])
-        timeouts = len([t for t in trade_history if t['type'] == 'timeout'])
-        total_trades = len(trade_history)
-        win_rate = (wins / total_trades * 100) if total_trades > 0 else 0
-        profit = final_balance - balance
-        avg_profit_loss = profit / total_trades if total_trades > 0 else 0
-        max_drawdown = min(0, min(equity_curve) - balance)
-
-        results[symbol] = {
-            "initial_balance": balance,
-            "final_balance": final_balance,
+    stored_run = load_run(RUN_CONFIG, historical_data)
+    if stored_run:
+        logger.info(f"Reusing stored result for run {stored_run['run_key'][:12]}")
+        summary = stored_run["summary"]
+        results = summary["per_symbol"]
+        combined_curve = stored_run["equity_curve"]
+    else:
+        all_trades = []
+        for symbol in SYMBOLS:
+            logger.info(f"Running backtest for {symbol} with starting balance {balance:.2f}")
+            final_balance, trade_history, equity_curve = apply_smc_strategy(historical_data[symbol], symbol, balance)
+            wins = len([t for t in trade_history if t['type'] == 'win'])
+            losses = len([t for t in trade_history if t['type'] == 'loss'])
+            timeouts = len([t for t in trade_history if t['type'] == 'timeout'])
+            total_trades = len(trade_history)
+            win_rate = (wins / total_trades * 100) if total_trades > 0 else 0
+            profit = final_balance - balance
+            avg_profit_loss = profit / total_trades if total_trades > 0 else 0
+            max_drawdown = min(0, min(equity_curve) - balance)
+
+            results[symbol] = {
+                "initial_balance": balance,
+                "final_balance": final_balance,
+                "total_trades": total_trades,
+                "wins": wins,
+                "losses": losses,
+                "timeouts": timeouts,
+                "win_rate": win_rate,
+                "profit": profit,
+                "avg_profit_loss": avg_profit_loss,
+                "max_drawdown": max_drawdown
+            }
+            equity_curves[symbol] = equity_curve
+            all_trades.extend(trade_history)
+            balance = final_balance  # Carry forward within cycle
+
+        combined_curve = []
+        for symbol in SYMBOLS:
+            combined_curve.extend(equity_curves[symbol])
+
+        # 20% carryover to next cycle
+        final_cycle_balance = balance
+        total_trades = sum(result["total_trades"] for result in results.values())
+        total_wins = sum(result["wins"] for result in results.values())
+        summary = {
+            "initial_balance": INITIAL_BALANCE,
+            "final_balance": final_cycle_balance,
+            "profit": sum(result["profit"] for result in results.values()),
+            "next_cycle_balance": final_cycle_balance * CARRYOVER_PERCENT,
+            "banked_amount": final_cycle_balance * (1 - CARRYOVER_PERCENT),
             "total_trades": total_trades,
-            "wins": wins,
-            "losses": losses,
-            "timeouts": timeouts,
-            "win_rate": win_rate,
-            "profit": profit,
-            "avg_profit_loss": avg_profit_loss,
-            "max_drawdown": max_drawdown
+            "wins": total_wins,
+            "losses": sum(result["losses"] for result in results.values()),
+            "timeouts": sum(result["timeouts"] for result in results.values()),
+            "win_rate": (total_wins / total_trades * 100) if total_trades > 0 else 0,
+            "max_drawdown": min(0, min(combined_curve) - INITIAL_BALANCE) if combined_curve else 0,
+            "per_symbol": results
         }
-        equity_curves[symbol] = equity_curve
-        balance = final_balance  # Carry forward within cycle
+        if results:
+            save_run(RUN_CONFIG, historical_data, summary, all_trades, combined_curve, source="backtest")
 
-    # 20% carryover to next cycle
-    final_cycle_balance = balance
-    balance = final_cycle_balance * CARRYOVER_PERCENT
-    banked_amount = final_cycle_balance * (1 - CARRYOVER_PERCENT)
+    balance = summary["next_cycle_balance"]
+    banked_amount = summary["banked_amount"]
 
     if not results:
         print("No backtesting results generated.")
     else:
-        total_profit = sum(result["profit"] for result in results.values())
+        total_profit = summary["profit"]
         print(f"Total profit over 4-week cycle: {total_profit:.2f} USDT")
         print(f"Average weekly profit: {total_profit / 4:.2f} USDT/week")
         print(f"Next cycle starting balance: {balance:.2f} USDT")
@@ -241,11 +276,8 @@ try:
             print(f"Max Drawdown: {result['max_drawdown']:.2f} USDT")
             print("-" * 50)
 
-    if equity_curves:
+    if combined_curve:
         plt.figure(figsize=(10, 6))
-        combined_curve = []
-        for symbol in SYMBOLS:
-            combined_curve.extend(equity_curves[symbol])
         plt.plot(combined_curve, label="Combined Equity")
         plt.title("Equity Curve (4 Coins, 20% Carryover)")
         plt.xlabel("Trade Step")
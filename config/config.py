@@ -10,6 +10,7 @@ CONFIG = {
     "fee": 0.00075,              # 0.075% Binance fee
     "min_atr_factor": 0.0001,    # Minimum ATR fallback
     "min_balance": 5,            # Stop if balance < $5
+    "sub_bar_fills": False,      # Resolve same-bar SL/TP order from 1m candles
 }
 
 INITIAL_BALANCE = 28  # Starting balance in USDT
@@ -23,4 +24,19 @@ SYMBOLS = [
 
 INTERVAL = '5m'  # 5-minute candles
 
-LIMIT = '1000'
\ No newline at end of file
+LIMIT = '1000'
+
+RESULTS_DIR = 'results'  # SQLite index + per-run npz arrays
+
+MINUTE_DATA_DIR = 'minute_data'  # Memory-mapped 1m candles for sub-bar fills
+
+EXCHANGE_CLIENT = {
+    "exchange_id": "binance",
+    "max_workers": 4,            # Max page requests in flight
+    "page_limit": 1000,          # Candles per request (Binance max)
+    "timeout_ms": 10000,         # Per-request timeout
+    "max_retries": 5,            # Retries per page on network/rate-limit errors
+    "backoff_base": 0.5,         # Seconds, doubled per retry (with jitter)
+    "backoff_max": 30,           # Cap on a single backoff
+    "max_gap_refetches": 2,      # Passes to re-fetch missing candles
+}
\ No newline at end of file
@@ -1,30 +1,26 @@
-import ccxt
-import pandas as pd
 from utils.logging import logger
-from config.config import INTERVAL, SYMBOLS
+from config.config import INTERVAL
+from data.exchange_client import ExchangeClient, to_ms
 
-"Connects to Binance"
-exchange = ccxt.binance()
+"Shared exchange client, created on first use so importing this module does not connect to Binance"
+_client = None
 
-"Fetches the open, high, low, close and volume data and organises the data into a table as well as turns the date and time into a readable format"
-def load_historical_data(symbol, interval=INTERVAL, limit=1000):
+def get_client():
+    global _client
+    if _client is None:
+        _client = ExchangeClient()
+    return _client
+
+"Fetches the open, high, low, close and volume data between since and until (defaults to the latest limit candles) and organises the data into a table as well as turns the date and time into a readable format"
+def load_historical_data(symbol, interval=INTERVAL, limit=1000, since=None, until=None):
     try:
-        ohlcv = exchange.fetch_ohlcv(symbol, timeframe=interval, limit=limit)
-        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        client = get_client()
+        until = to_ms(until) if until is not None else client.exchange.milliseconds()
+        if since is None:
+            since = until - client.exchange.parse_timeframe(interval) * 1000 * limit
+        df = client.fetch_ohlcv_range(symbol, since, until, timeframe=interval)
+        logger.info(f"Loaded data for {symbol}: {len(df)} rows")
         return df
     except Exception as e:
         logger.error(f"Error loading data for {symbol}: {e}")
-        return None
-
-"Creates an empty dictionary to store data per crypto coin"
-historical_data = {}
-
-"Loops through a list of crypto coins and applies the load_historical_data function to each of them"
-for symbol in SYMBOLS:
-    df = load_historical_data(symbol)
-    if df is not None:
-        historical_data[symbol] = df
-        logger.info(f"Loaded data for {symbol}: {len(df)} rows")
-    else:
-        logger.warning(f"Skipping {symbol} due to data loading error")
\ No newline at end of file
+        return None
\ No newline at end of file
@@ -0,0 +1,164 @@
+import numbers
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import ccxt
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from config.config import EXCHANGE_CLIENT, INTERVAL
+from utils.logging import logger
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+"Errors worth retrying: timeouts, dropped connections, rate limits and exchange maintenance are all ccxt.NetworkError subclasses"
+RETRYABLE_ERRORS = (ccxt.NetworkError,)
+
+"Converts a datetime-like value or epoch milliseconds into epoch milliseconds"
+def to_ms(value):
+    if isinstance(value, numbers.Integral):
+        return int(value)
+    return pd.Timestamp(value).value // 10**6
+
+"Builds one configured ccxt exchange whose HTTP session is pooled and shared across every request and worker thread"
+def create_exchange(exchange_id=EXCHANGE_CLIENT["exchange_id"], max_workers=EXCHANGE_CLIENT["max_workers"], timeout_ms=EXCHANGE_CLIENT["timeout_ms"]):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    "ccxt's own throttle is not thread-safe, ExchangeClient does the rate limiting instead"
+    return getattr(ccxt, exchange_id)({"enableRateLimit": False, "timeout": timeout_ms, "session": session})
+
+"Pages OHLCV history over arbitrary date ranges with bounded parallelism, retries, rate limiting and gap re-fetching"
+class ExchangeClient:
+    def __init__(self, exchange=None, max_workers=EXCHANGE_CLIENT["max_workers"], page_limit=EXCHANGE_CLIENT["page_limit"],
+                 max_retries=EXCHANGE_CLIENT["max_retries"], backoff_base=EXCHANGE_CLIENT["backoff_base"], backoff_max=EXCHANGE_CLIENT["backoff_max"],
+                 max_gap_refetches=EXCHANGE_CLIENT["max_gap_refetches"], min_request_interval=None, sleep=time.sleep, clock=time.monotonic):
+        self.exchange = exchange if exchange is not None else create_exchange(max_workers=max_workers)
+        self.max_workers = max_workers
+        self.page_limit = page_limit
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_gap_refetches = max_gap_refetches
+        if min_request_interval is None:
+            min_request_interval = getattr(self.exchange, "rateLimit", 0) / 1000
+        self.min_request_interval = min_request_interval
+        self.sleep = sleep
+        self.clock = clock
+        self._rate_lock = threading.Lock()
+        self._next_request_at = 0.0
+        self._markets_lock = threading.Lock()
+        self._markets_loaded = False
+
+    "Blocks until the next request slot is free so parallel workers together stay under the exchange rate limit"
+    def _wait_for_slot(self):
+        with self._rate_lock:
+            now = self.clock()
+            wait = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + self.min_request_interval
+        if wait > 0:
+            self.sleep(wait)
+
+    "Exponential backoff with full jitter, so retrying workers do not hit the exchange in lockstep"
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    "Runs a rate-limited request, retrying network errors and rate limits and re-raising anything else straight away"
+    def _with_retries(self, description, request):
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_slot()
+            try:
+                return request()
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"{type(e).__name__} {description}, retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+                self.sleep(delay)
+
+    def _fetch_page(self, symbol, timeframe, since, limit):
+        return self._with_retries(
+            f"fetching {symbol} page at {since}",
+            lambda: self.exchange.fetch_ohlcv(symbol, timeframe=timeframe, since=since, limit=limit)
+        )
+
+    "Loads the exchange's markets once up front, otherwise every worker's first fetch_ohlcv triggers ccxt's unlocked lazy load in parallel"
+    def _load_markets(self):
+        with self._markets_lock:
+            if not self._markets_loaded:
+                self._with_retries("loading markets", self.exchange.load_markets)
+                self._markets_loaded = True
+
+    "Fetches every page covering the given (start, end) ranges using at most max_workers requests in flight"
+    def _fetch_pages(self, symbol, timeframe, ranges, timeframe_ms):
+        page_ms = self.page_limit * timeframe_ms
+        pages = []
+        for start, end in ranges:
+            for page_start in range(start, end, page_ms):
+                pages.append((page_start, min(self.page_limit, -(-(end - page_start) // timeframe_ms))))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = pool.map(lambda page: self._fetch_page(symbol, timeframe, *page), pages)
+            return [row for result in results for row in result]
+
+    "Returns the missing candle ranges as (start, end) pairs, end exclusive, on the expected timeframe grid"
+    @staticmethod
+    def find_gaps(timestamps, since, until, timeframe_ms):
+        gaps = []
+        expected = since
+        for ts in timestamps:
+            if ts > expected:
+                gaps.append((expected, ts))
+            expected = max(expected, ts + timeframe_ms)
+        if expected < until:
+            gaps.append((expected, until))
+        return gaps
+
+    "Coalesces gaps that fit in one page request together, so sparse missing candles cost one request per page rather than one per gap"
+    @staticmethod
+    def merge_gaps(gaps, page_ms):
+        merged = []
+        for start, end in sorted(gaps):
+            if merged and end - merged[-1][0] <= page_ms:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+            else:
+                merged.append((start, end))
+        return merged
+
+    "Sorts candles, drops anything outside [since, until) and de-duplicates overlapping pages, keeping the latest copy of each candle"
+    @staticmethod
+    def _merge(rows, since, until):
+        df = pd.DataFrame(rows, columns=OHLCV_COLUMNS)
+        df = df[(df['timestamp'] >= since) & (df['timestamp'] < until)]
+        df = df.drop_duplicates('timestamp', keep='last').sort_values('timestamp')
+        return df.reset_index(drop=True)
+
+    "Loads all candles for symbol between since and until (datetimes or epoch ms, until exclusive) as a DataFrame"
+    def fetch_ohlcv_range(self, symbol, since, until=None, timeframe=INTERVAL):
+        timeframe_ms = self.exchange.parse_timeframe(timeframe) * 1000
+        since = -(-to_ms(since) // timeframe_ms) * timeframe_ms
+        "Candles after now do not exist yet, so until is clamped to keep them from showing up as a trailing gap"
+        now = self.exchange.milliseconds()
+        until = min(to_ms(until), now) if until is not None else now
+
+        self._load_markets()
+        rows = self._fetch_pages(symbol, timeframe, [(since, until)], timeframe_ms)
+        df = self._merge(rows, since, until)
+
+        "Re-fetches missing candles, exchanges do have genuine gaps (e.g. maintenance) so only a bounded number of passes are made"
+        gaps = self.find_gaps(df['timestamp'].tolist(), since, until, timeframe_ms)
+        for refetch in range(self.max_gap_refetches):
+            if not gaps:
+                break
+            logger.info(f"{symbol}: Re-fetching {len(gaps)} gap(s), pass {refetch + 1}/{self.max_gap_refetches}")
+            rows.extend(self._fetch_pages(symbol, timeframe, self.merge_gaps(gaps, self.page_limit * timeframe_ms), timeframe_ms))
+            df = self._merge(rows, since, until)
+            gaps = self.find_gaps(df['timestamp'].tolist(), since, until, timeframe_ms)
+        if gaps:
+            missing = sum((end - start) // timeframe_ms for start, end in gaps)
+            logger.warning(f"{symbol}: {missing} candle(s) still missing across {len(gaps)} gap(s) after re-fetching")
+
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
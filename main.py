@@ -1,9 +1,11 @@
-from config.config import CONFIG, INITIAL_BALANCE, SYMBOLS
+from config.config import CONFIG, INITIAL_BALANCE, SYMBOLS, INTERVAL
 from data.data_fetcher import load_historical_data
 from research.coin_researcher import research_profitable_coins
 from trading.trader import apply_smc_strategy
+from trading.fill_model import MinuteFillModel
 from utils.logging import setup_logging
 from utils.plotting import plot_equity_curve
+from utils.results_store import load_run, save_run
 import pandas as pd
 
 def run_backtest():
@@ -12,11 +14,28 @@ def run_backtest():
     
     "Loads 1000 candles for all 20 coins"
     historical_data = {coin: load_historical_data(coin) for coin in SYMBOLS}
-    historical_data = {k: v for k, v in historical_data.items() if not v.empty}
+    historical_data = {k: v for k, v in historical_data.items() if v is not None and not v.empty}
     if not historical_data:
         logger.error("No data loaded. Exiting.")
         return
     
+    "Reuses the stored result if this exact config has already been run over the same coins and dates"
+    run_config = {**CONFIG, "initial_balance": INITIAL_BALANCE, "interval": INTERVAL, "strategy": "main"}
+    stored_run = load_run(run_config, historical_data)
+    if stored_run:
+        logger.info(f"Reusing stored result for run {stored_run['run_key'][:12]}")
+        print_summary(stored_run["summary"])
+        plot_equity_curve({'Overall': stored_run["equity_curve"]})
+        return
+    
+    "Loads 1m candles into memory-mapped files so same-bar stop loss/take profit order can be resolved"
+    fill_model = None
+    if CONFIG["sub_bar_fills"]:
+        fill_model = MinuteFillModel().attach(
+            historical_data,
+            fetch_minutes=lambda coin, since, until: load_historical_data(coin, interval='1m', since=since, until=until)
+        )
+    
     balance = INITIAL_BALANCE
     all_trades = []
     equity_curve = [balance]
@@ -37,8 +56,8 @@ def run_backtest():
         
         "Manage active trade if exists"
         if active_trade:
-            balance, active_trade, trade_history, equity_curve, watch_symbol = apply_smc_strategy(
-                current_data, [], active_symbol, balance, active_trade
+            balance, active_trade, trade_history, equity_step, watch_symbol = apply_smc_strategy(
+                current_data, [], active_symbol, balance, active_trade, fill_model
             )
             all_trades.extend(trade_history)
             equity_curve.extend(equity_step[1:])
@@ -73,17 +92,37 @@ def run_backtest():
     total_timeouts = len([t for t in all_trades if t["type"] == "timeout"])
     win_profit = sum(t["profit_loss"] for t in all_trades if t["type"] == "win")
     loss_profit = sum(t["profit_loss"] for t in all_trades if t["type"] in ["loss", "timeout"])
-    print(f"Summary (3.5-day backtest):")
-    print(f"  Total Profit: {total_profit:.2f} USDT")
-    print(f"  Trading Balance: {trading_balance:.2f} USDT")
-    print(f"  Reserve Balance: {reserve_balance:.2f} USDT")
-    print(f"  Final Balance: {balance:.2f} USDT")
-    print(f"  Total Trades: {total_trades}")
-    print(f"  Wins: {total_wins} ({win_profit:.2f} USDT)")
-    print(f"  Losses: {total_losses} ({loss_profit:.2f} USDT)")
-    print(f"  Timeouts: {total_timeouts}")
-    print(f"  Win Rate: {(total_wins / total_trades * 100) if total_trades > 0 else 0:.2f}%")
+    summary = {
+        "initial_balance": INITIAL_BALANCE,
+        "final_balance": balance,
+        "profit": total_profit,
+        "trading_balance": trading_balance,
+        "reserve_balance": reserve_balance,
+        "total_trades": total_trades,
+        "wins": total_wins,
+        "win_profit": win_profit,
+        "losses": total_losses,
+        "loss_profit": loss_profit,
+        "timeouts": total_timeouts,
+        "win_rate": (total_wins / total_trades * 100) if total_trades > 0 else 0,
+        "max_drawdown": min(0, min(equity_curve) - INITIAL_BALANCE),
+    }
+    save_run(run_config, historical_data, summary, all_trades, equity_curve, source="main")
+    print_summary(summary)
     plot_equity_curve({'Overall': equity_curve})
 
+"Prints the summary of a backtest run, used for both fresh and stored runs"
+def print_summary(summary):
+    print(f"Summary (3.5-day backtest):")
+    print(f"  Total Profit: {summary['profit']:.2f} USDT")
+    print(f"  Trading Balance: {summary['trading_balance']:.2f} USDT")
+    print(f"  Reserve Balance: {summary['reserve_balance']:.2f} USDT")
+    print(f"  Final Balance: {summary['final_balance']:.2f} USDT")
+    print(f"  Total Trades: {summary['total_trades']}")
+    print(f"  Wins: {summary['wins']} ({summary['win_profit']:.2f} USDT)")
+    print(f"  Losses: {summary['losses']} ({summary['loss_profit']:.2f} USDT)")
+    print(f"  Timeouts: {summary['timeouts']}")
+    print(f"  Win Rate: {summary['win_rate']:.2f}%")
+
 if __name__ == "__main__":
     run_backtest()
\ No newline at end of file
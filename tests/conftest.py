@@ -0,0 +1,14 @@
+import logging
+import os
+import sys
+
+"Makes the top-level packages (config, data, trading, utils) importable when pytest is run from the repo root"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+"utils.logging writes to trader.log in the working directory, keep test runs out of the tracked log file"
+import utils.logging  # noqa: E402
+
+for handler in list(logging.getLogger().handlers):
+    if isinstance(handler, logging.FileHandler):
+        logging.getLogger().removeHandler(handler)
+        handler.close()
@@ -0,0 +1,81 @@
+import random
+import threading
+import time
+import ccxt
+
+"Local stand-in for a ccxt exchange, serves synthetic candles and injects latency, network errors, rate limits and missing candles"
+class FakeExchange:
+    rateLimit = 0
+
+    def __init__(self, start_ms, end_ms, latency=0.0, error_rate=0.0, rate_limit_rate=0.0, drop_rate=0.0, seed=0):
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.market_loads = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    parse_timeframe = staticmethod(ccxt.Exchange.parse_timeframe)
+
+    def milliseconds(self):
+        return self.end_ms
+
+    "Deterministic candle for a timestamp so repeated and overlapping pages return identical rows"
+    @staticmethod
+    def candle(ts):
+        price = 100 + (ts // 60000) % 50
+        return [ts, price, price + 1, price - 1, price + 0.5, 10.0]
+
+    def load_markets(self, reload=False):
+        with self.lock:
+            self.market_loads += 1
+        return {}
+
+    "Tracks how many requests are in flight at once so tests can check the client's concurrency bound"
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=None):
+        with self.lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return self._fetch_ohlcv(symbol, timeframe, since, limit)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def _fetch_ohlcv(self, symbol, timeframe, since, limit):
+        with self.lock:
+            self.calls += 1
+            delay = self.random.uniform(0, self.latency)
+            roll = self.random.random()
+            drops = self.random.random() < self.drop_rate
+        time.sleep(delay)
+
+        if roll < self.error_rate:
+            with self.lock:
+                self.errors += 1
+            raise ccxt.RequestTimeout(f"fake timeout for {symbol} at {since}")
+        if roll < self.error_rate + self.rate_limit_rate:
+            with self.lock:
+                self.errors += 1
+            raise ccxt.RateLimitExceeded(f"fake rate limit for {symbol} at {since}")
+
+        timeframe_ms = self.parse_timeframe(timeframe) * 1000
+        limit = limit or 500
+        since = since if since is not None else self.end_ms - limit * timeframe_ms
+        first = max(since, self.start_ms)
+        first = -(-first // timeframe_ms) * timeframe_ms
+        candles = [self.candle(ts) for ts in range(first, self.end_ms, timeframe_ms)][:limit]
+
+        "Randomly drops candles from a page to simulate gaps that a later request fills in"
+        if drops and candles:
+            with self.lock:
+                dropped = set(self.random.sample(range(len(candles)), k=max(1, len(candles) // 10)))
+            candles = [c for i, c in enumerate(candles) if i not in dropped]
+        return candles
@@ -0,0 +1,122 @@
+import ccxt
+import pandas as pd
+import pytest
+from data.exchange_client import ExchangeClient
+from fake_exchange import FakeExchange
+
+SYMBOL = "BTC/USDT"
+TIMEFRAME_MS = 5 * 60 * 1000
+START = pd.Timestamp("2025-01-01").value // 10**6
+END = START + 5000 * TIMEFRAME_MS
+
+def _client(exchange, **kwargs):
+    kwargs.setdefault("max_retries", 8)
+    kwargs.setdefault("max_gap_refetches", 10)
+    return ExchangeClient(exchange=exchange, max_workers=4, page_limit=1000, sleep=lambda s: None, **kwargs)
+
+def _assert_complete(df, since, until):
+    expected = pd.to_datetime(list(range(since, until, TIMEFRAME_MS)), unit='ms')
+    assert df['timestamp'].is_unique
+    assert df['timestamp'].is_monotonic_increasing
+    assert list(df['timestamp']) == list(expected)
+
+"Serves each candle in missing_ts only from the second request onwards, so every gap is filled by exactly one re-fetch"
+class GappyExchange(FakeExchange):
+    def __init__(self, *args, missing_ts=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.missing_ts = set(missing_ts)
+
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=None):
+        candles = super().fetch_ohlcv(symbol, timeframe, since, limit)
+        if self.calls == 1:
+            candles = [c for c in candles if c[0] not in self.missing_ts]
+        return candles
+
+"Returns pages that run past the requested limit into the next page"
+class OverlappingExchange(FakeExchange):
+    def fetch_ohlcv(self, symbol, timeframe='5m', since=None, limit=None):
+        return super().fetch_ohlcv(symbol, timeframe, since, limit + 50)
+
+def test_result_is_complete_despite_errors_rate_limits_and_drops():
+    exchange = FakeExchange(START, END, error_rate=0.2, rate_limit_rate=0.1, drop_rate=0.3, seed=7)
+    df = _client(exchange).fetch_ohlcv_range(SYMBOL, START, END, timeframe='5m')
+    _assert_complete(df, START, END)
+    assert exchange.errors > 0
+
+def test_retries_are_exhausted_then_reraised():
+    exchange = FakeExchange(START, END, error_rate=1.0)
+    with pytest.raises(ccxt.RequestTimeout):
+        _client(exchange, max_retries=2).fetch_ohlcv_range(SYMBOL, START, START + 10 * TIMEFRAME_MS, timeframe='5m')
+    assert exchange.calls == 3
+
+def test_unaligned_since_is_rounded_up_to_grid():
+    exchange = FakeExchange(START, END)
+    df = _client(exchange).fetch_ohlcv_range(SYMBOL, START + 1, START + 10 * TIMEFRAME_MS, timeframe='5m')
+    _assert_complete(df, START + TIMEFRAME_MS, START + 10 * TIMEFRAME_MS)
+
+def test_overlapping_pages_are_deduplicated():
+    exchange = OverlappingExchange(START, END)
+    df = _client(exchange).fetch_ohlcv_range(SYMBOL, START, END, timeframe='5m')
+    _assert_complete(df, START, END)
+
+def test_sparse_gaps_are_refetched_in_one_page_request():
+    missing = range(START + TIMEFRAME_MS, START + 1000 * TIMEFRAME_MS, 10 * TIMEFRAME_MS)
+    exchange = GappyExchange(START, END, missing_ts=missing)
+    df = _client(exchange).fetch_ohlcv_range(SYMBOL, START, START + 1000 * TIMEFRAME_MS, timeframe='5m')
+    _assert_complete(df, START, START + 1000 * TIMEFRAME_MS)
+    assert exchange.calls == 2
+
+def test_until_in_the_future_is_clamped_to_now():
+    exchange = FakeExchange(START, END)
+    df = _client(exchange).fetch_ohlcv_range(SYMBOL, END - 10 * TIMEFRAME_MS, END + 100 * TIMEFRAME_MS, timeframe='5m')
+    _assert_complete(df, END - 10 * TIMEFRAME_MS, END)
+    assert exchange.calls == 1
+
+def test_merge_gaps_keeps_gaps_further_apart_than_a_page():
+    page_ms = 10 * TIMEFRAME_MS
+    gaps = [(0, TIMEFRAME_MS), (5 * TIMEFRAME_MS, 6 * TIMEFRAME_MS), (30 * TIMEFRAME_MS, 31 * TIMEFRAME_MS)]
+    assert ExchangeClient.merge_gaps(gaps, page_ms) == [(0, 6 * TIMEFRAME_MS), (30 * TIMEFRAME_MS, 31 * TIMEFRAME_MS)]
+
+def test_requests_in_flight_never_exceed_max_workers():
+    exchange = FakeExchange(START, END, latency=0.02, seed=3)
+    client = ExchangeClient(exchange=exchange, max_workers=3, page_limit=100, sleep=lambda s: None)
+    df = client.fetch_ohlcv_range(SYMBOL, START, START + 2000 * TIMEFRAME_MS, timeframe='5m')
+    _assert_complete(df, START, START + 2000 * TIMEFRAME_MS)
+    assert exchange.calls == 20
+    assert 1 < exchange.peak_in_flight <= 3
+
+def test_requests_are_spaced_by_min_request_interval():
+    "Fake clock that only moves when the client sleeps, so the spacing is exact"
+    now = [0.0]
+    waits = []
+
+    def sleep(seconds):
+        waits.append(seconds)
+        now[0] += seconds
+
+    exchange = FakeExchange(START, END)
+    client = ExchangeClient(exchange=exchange, max_workers=1, page_limit=100, min_request_interval=0.5, sleep=sleep, clock=lambda: now[0])
+    client.fetch_ohlcv_range(SYMBOL, START, START + 500 * TIMEFRAME_MS, timeframe='5m')
+    "The markets load takes the first slot, each of the 5 page requests then waits one interval for its own slot"
+    assert exchange.calls == 5
+    assert waits == [0.5] * 5
+
+def test_markets_are_loaded_once_before_fanning_out():
+    exchange = FakeExchange(START, END, latency=0.01)
+    client = _client(exchange)
+    client.fetch_ohlcv_range(SYMBOL, START, END, timeframe='5m')
+    client.fetch_ohlcv_range(SYMBOL, START, END, timeframe='5m')
+    assert exchange.market_loads == 1
+
+def test_markets_load_is_retried():
+    class FlakyMarkets(FakeExchange):
+        def load_markets(self, reload=False):
+            super().load_markets(reload)
+            if self.market_loads < 3:
+                raise ccxt.ExchangeNotAvailable("fake maintenance")
+            return {}
+
+    exchange = FlakyMarkets(START, END)
+    df = _client(exchange).fetch_ohlcv_range(SYMBOL, START, START + 10 * TIMEFRAME_MS, timeframe='5m')
+    _assert_complete(df, START, START + 10 * TIMEFRAME_MS)
+    assert exchange.market_loads == 3
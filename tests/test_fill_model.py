@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from trading.fill_model import MinuteFillModel, save_minute_bars
+
+SYMBOL = "BTC/USDT"
+STOP_LOSS = 105
+TP = 95
+
+def _minutes(start, highs, lows):
+    return pd.DataFrame({
+        "timestamp": pd.date_range(start, periods=len(highs), freq="1min"),
+        "open": 100.0, "high": highs, "low": lows, "close": 100.0, "volume": 1.0,
+    })
+
+def _bars(start, periods):
+    return {SYMBOL: pd.DataFrame({"timestamp": pd.date_range(start, periods=periods, freq="5min")})}
+
+@pytest.fixture
+def model(tmp_path):
+    "Bar 0: TP at minute 1, SL at minute 3. Bar 1: SL at minute 1, TP at minute 4. Bar 2: one minute spans both levels"
+    highs = [101, 101, 101, 106, 101] + [101, 106, 101, 101, 101] + [101, 101, 106, 101, 101]
+    lows = [99, 94, 99, 99, 99] + [99, 99, 99, 99, 94] + [99, 99, 94, 99, 99]
+    save_minute_bars(SYMBOL, _minutes("2025-03-01", highs, lows), tmp_path)
+    return MinuteFillModel(data_dir=tmp_path, interval="5m").attach(_bars("2025-03-01", 3))
+
+def _bar(i):
+    return pd.Timestamp("2025-03-01") + pd.Timedelta(minutes=5 * i)
+
+def test_tp_touched_first(model):
+    assert model.fill_price(SYMBOL, _bar(0), 106, 94, 106, STOP_LOSS, TP) == TP
+
+def test_sl_touched_first(model):
+    assert model.fill_price(SYMBOL, _bar(1), 106, 94, 94, STOP_LOSS, TP) == STOP_LOSS
+
+def test_single_minute_spanning_both_levels_fills_stop(model):
+    assert model.fill_price(SYMBOL, _bar(2), 106, 94, 100, STOP_LOSS, TP) == STOP_LOSS
+
+def test_levels_outside_bar_range_skip_minute_data(model, monkeypatch):
+    def fail(*args):
+        raise AssertionError("1m data read for a bar whose range contains neither level")
+    monkeypatch.setattr(model, "_bar_minutes", fail)
+    assert model.fill_price(SYMBOL, _bar(0), 104, 96, 100, STOP_LOSS, TP) == 100
+
+def test_missing_minute_window_falls_back_to_close(model):
+    assert model.fill_price(SYMBOL, _bar(5), 106, 94, 102, STOP_LOSS, TP) == 102
+
+def test_partial_minute_window_without_touch_falls_back_to_close(tmp_path):
+    "Only the first two minutes of the bar are cached and neither touches a level"
+    save_minute_bars(SYMBOL, _minutes("2025-03-01", [101, 101], [99, 99]), tmp_path)
+    model = MinuteFillModel(data_dir=tmp_path, interval="5m").attach(_bars("2025-03-01", 1))
+    assert model.fill_price(SYMBOL, _bar(0), 106, 94, 102, STOP_LOSS, TP) == 102
+
+def test_stale_cache_is_refetched(tmp_path):
+    save_minute_bars(SYMBOL, _minutes("2025-02-01", [101] * 5, [99] * 5), tmp_path)
+    calls = []
+
+    def fetch_minutes(symbol, since, until):
+        calls.append((symbol, since, until))
+        return _minutes("2025-03-01", [101, 101, 106, 101, 101], [99, 94, 99, 99, 99])
+
+    model = MinuteFillModel(data_dir=tmp_path, interval="5m").attach(_bars("2025-03-01", 1), fetch_minutes=fetch_minutes)
+    assert calls == [(SYMBOL, _bar(0), _bar(1))]
+    assert model.fill_price(SYMBOL, _bar(0), 106, 94, 100, STOP_LOSS, TP) == TP
+
+def test_covering_cache_is_not_refetched(tmp_path):
+    save_minute_bars(SYMBOL, _minutes("2025-03-01", [101] * 5, [99] * 5), tmp_path)
+    MinuteFillModel(data_dir=tmp_path, interval="5m").attach(_bars("2025-03-01", 1), fetch_minutes=pytest.fail)
@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+from utils.results_store import config_hash, load_run, save_run, top_runs
+
+def _data(start="2025-03-01", periods=10, symbols=("BTC/USDT", "ETH/USDT")):
+    timestamps = pd.date_range(start, periods=periods, freq="5min")
+    return {symbol: pd.DataFrame({"timestamp": timestamps, "close": 100.0}) for symbol in symbols}
+
+def _trades():
+    return [
+        {"type": "win", "profit_loss": 1.2, "symbol": "BTC/USDT", "timestamp": pd.Timestamp("2025-03-01 00:15")},
+        {"type": "loss", "profit_loss": -0.8, "symbol": "ETH/USDT", "timestamp": pd.Timestamp("2025-03-01 00:30")},
+    ]
+
+CONFIG = {"risk_percent": 5, "trailing_stop_percent": 0.02, "strategy": "main"}
+SUMMARY = {"profit": 1.5, "total_trades": 2, "wins": 1, "losses": 1}
+
+def test_config_hash_ignores_key_order():
+    assert config_hash({"a": 1, "b": [1, 2]}) == config_hash({"b": [1, 2], "a": 1})
+    assert config_hash({"a": 1}) != config_hash({"a": 2})
+
+def test_identical_run_is_reused(tmp_path):
+    save_run(CONFIG, _data(), SUMMARY, _trades(), [28.0, 29.2, 28.4], source="main", results_dir=tmp_path)
+    reordered = dict(reversed(list(CONFIG.items())))
+    stored = load_run(reordered, _data(symbols=("ETH/USDT", "BTC/USDT")), results_dir=tmp_path)
+    assert stored is not None
+    assert stored["summary"] == SUMMARY
+    assert stored["config"] == CONFIG
+
+@pytest.mark.parametrize("config, data", [
+    ({**CONFIG, "risk_percent": 4}, _data()),
+    (CONFIG, _data(symbols=("BTC/USDT",))),
+    (CONFIG, _data(start="2025-03-02")),
+    (CONFIG, _data(periods=11)),
+])
+def test_changed_config_symbols_or_dates_miss(tmp_path, config, data):
+    save_run(CONFIG, _data(), SUMMARY, _trades(), [28.0], results_dir=tmp_path)
+    assert load_run(config, data, results_dir=tmp_path) is None
+
+def test_ledger_and_equity_curve_round_trip(tmp_path):
+    save_run(CONFIG, _data(), SUMMARY, _trades(), [28.0, 29.2, 28.4], results_dir=tmp_path)
+    stored = load_run(CONFIG, _data(), results_dir=tmp_path)
+    expected = pd.DataFrame(_trades())
+    assert stored["equity_curve"] == [28.0, 29.2, 28.4]
+    assert list(stored["trades"].columns) == list(expected.columns)
+    assert pd.api.types.is_datetime64_any_dtype(stored["trades"]["timestamp"])
+    assert list(stored["trades"]["timestamp"]) == list(expected["timestamp"])
+    assert stored["trades"]["profit_loss"].tolist() == expected["profit_loss"].tolist()
+    assert stored["trades"]["symbol"].tolist() == expected["symbol"].tolist()
+
+def test_empty_ledger_round_trip(tmp_path):
+    save_run(CONFIG, _data(), SUMMARY, [], [28.0], results_dir=tmp_path)
+    stored = load_run(CONFIG, _data(), results_dir=tmp_path)
+    assert stored["trades"].empty
+    assert stored["equity_curve"] == [28.0]
+
+def test_top_runs_filters_by_risk_and_orders_by_profit(tmp_path):
+    for risk, profit in [(3, 1.0), (5, 4.0), (7, 9.0), (2, 2.5), (5, -1.0)]:
+        config = {**CONFIG, "risk_percent": risk, "profit_tag": profit}
+        save_run(config, _data(), {**SUMMARY, "profit": profit}, [], [28.0], results_dir=tmp_path)
+    runs = top_runs(by="profit", limit=3, max_risk_percent=5, results_dir=tmp_path)
+    assert runs["profit"].tolist() == [4.0, 2.5, 1.0]
+    assert (runs["risk_percent"] <= 5).all()
+
+def test_top_runs_rejects_unknown_sort_column(tmp_path):
+    with pytest.raises(ValueError):
+        top_runs(by="profit; DROP TABLE runs", results_dir=tmp_path)
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+from trading.fill_model import MinuteFillModel, save_minute_bars
+
+pytest.importorskip("pandas_ta")
+from trading.trader import manage_trade  # noqa: E402
+
+SYMBOL = "BTC/USDT"
+BAR = pd.Timestamp("2025-03-01")
+
+def _trade():
+    return {
+        "side": "sell", "entry_price": 100, "stop_loss": 105, "position_size": 1,
+        "tp_targets": [95, 90, 85], "tp_hit": [False, False, False], "entry_index": 0, "entry_fee": 0,
+    }
+
+def _model(tmp_path, highs, lows, closes):
+    minutes = pd.DataFrame({
+        "timestamp": pd.date_range(BAR, periods=len(highs), freq="1min"),
+        "open": 100.0, "high": highs, "low": lows, "close": closes, "volume": 1.0,
+    })
+    save_minute_bars(SYMBOL, minutes, tmp_path)
+    return MinuteFillModel(data_dir=tmp_path, interval="5m").attach({SYMBOL: pd.DataFrame({"timestamp": [BAR]})})
+
+@pytest.fixture
+def model(tmp_path):
+    "Low reaches TP1 (95) at minute 1, then the price reverses through the stop from minute 3 and the bar closes at 106"
+    return _model(tmp_path, [101, 100, 101, 106, 106], [99, 94, 99, 100, 105], [100, 96, 100, 105, 106])
+
+def test_tp_then_stop_in_same_bar_closes_at_breakeven_stop(model):
+    balance, trade, history = manage_trade(SYMBOL, 106, _trade(), 28, [], 0, 1, BAR, 106, 94, model)
+    assert trade is None
+    assert [t["type"] for t in history] == ["loss"]
+    "TP1 moved the stop to entry (100), so the loss is only the exit fee at 100"
+    assert history[0]["profit_loss"] == pytest.approx(-100 * 0.00075)
+    assert balance == pytest.approx(28 - 100 * 0.00075)
+
+def test_close_based_fills_close_at_original_stop():
+    balance, trade, history = manage_trade(SYMBOL, 106, _trade(), 28, [], 0, 1, BAR)
+    assert trade is None
+    assert history[0]["profit_loss"] == pytest.approx(-5 - 106 * 0.00075)
+
+def test_tp_without_later_reversal_keeps_trade_open(tmp_path):
+    model = _model(tmp_path, [101, 99, 98, 97, 97], [99, 94, 95, 95, 96], [99, 96, 97, 96, 96])
+    balance, trade, history = manage_trade(SYMBOL, 96, _trade(), 28, [], 0, 1, BAR, 101, 94, model)
+    assert history == []
+    assert trade["tp_hit"] == [True, False, False]
+    assert trade["stop_loss"] == 100
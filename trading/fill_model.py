@@ -0,0 +1,115 @@
+import os
+import numpy as np
+import pandas as pd
+from config.config import INTERVAL, MINUTE_DATA_DIR
+from utils.logging import logger
+
+"Column layout of the memory-mapped 1m arrays: timestamp in ms since epoch followed by OHLCV"
+MINUTE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+TS, OPEN, HIGH, LOW, CLOSE, VOLUME = range(len(MINUTE_COLUMNS))
+
+def _minute_path(symbol, data_dir):
+    return os.path.join(data_dir, f"{symbol.replace('/', '_')}_1m.npy")
+
+"Converts a timestamp column (or a single timestamp) into integer milliseconds since epoch"
+def _to_ms(timestamps):
+    if isinstance(timestamps, pd.Series):
+        return timestamps.values.astype('datetime64[ms]').astype(np.int64)
+    return pd.Timestamp(timestamps).value // 10**6
+
+"Writes 1m candles to a .npy file so they can be memory-mapped instead of held in pandas"
+def save_minute_bars(symbol, df, data_dir=MINUTE_DATA_DIR):
+    os.makedirs(data_dir, exist_ok=True)
+    df = df.sort_values('timestamp').drop_duplicates('timestamp')
+    array = np.empty((len(df), len(MINUTE_COLUMNS)), dtype=np.float64)
+    array[:, TS] = _to_ms(df['timestamp'])
+    for i, column in enumerate(MINUTE_COLUMNS[1:], start=1):
+        array[:, i] = df[column].to_numpy(dtype=np.float64)
+    path = _minute_path(symbol, data_dir)
+    np.save(path, array)
+    logger.info(f"Saved {len(array)} 1m candles for {symbol} to {path}")
+    return path
+
+"Opens a symbol's 1m candles as a read-only memory map, returns None if they have not been saved yet"
+def load_minute_bars(symbol, data_dir=MINUTE_DATA_DIR):
+    path = _minute_path(symbol, data_dir)
+    if not os.path.exists(path):
+        return None
+    return np.load(path, mmap_mode='r')
+
+"Resolves which of a short trade's stop-loss or take-profit was touched first inside a bar by walking its 1m candles"
+class MinuteFillModel:
+    def __init__(self, data_dir=MINUTE_DATA_DIR, interval=INTERVAL):
+        self.data_dir = data_dir
+        self.bar_ms = pd.Timedelta(interval).value // 10**6
+        self.minutes = {}
+        self.index = {}
+
+    "Returns True if the cached 1m candles span every bar, the last bar may still be forming so only its first minute is required"
+    def _covers(self, minutes, bar_ts):
+        if minutes is None or len(minutes) == 0:
+            return False
+        return minutes[0, TS] <= bar_ts[0] and minutes[-1, TS] >= bar_ts[-1]
+
+    "Maps every bar of each symbol to its [start, end) row range in the 1m array, built once per backtest. If fetch_minutes(symbol, since, until) is given, a missing or stale 1m cache is re-fetched first"
+    def attach(self, historical_data, fetch_minutes=None):
+        for symbol, df in historical_data.items():
+            bar_ts = _to_ms(df['timestamp'])
+            minutes = load_minute_bars(symbol, self.data_dir)
+            if fetch_minutes is not None and not self._covers(minutes, bar_ts):
+                logger.info(f"{symbol}: 1m cache does not cover the 5m bars, re-fetching")
+                minute_df = fetch_minutes(symbol, df['timestamp'].iloc[0], df['timestamp'].iloc[-1] + pd.Timedelta(milliseconds=self.bar_ms))
+                if minute_df is not None and not minute_df.empty:
+                    save_minute_bars(symbol, minute_df, self.data_dir)
+                    minutes = load_minute_bars(symbol, self.data_dir)
+            if minutes is None or len(minutes) == 0:
+                logger.warning(f"{symbol}: No 1m candles found, falling back to close-based fills")
+                continue
+            minute_ts = np.asarray(minutes[:, TS], dtype=np.int64)
+            starts = np.searchsorted(minute_ts, bar_ts, side='left')
+            ends = np.searchsorted(minute_ts, bar_ts + self.bar_ms, side='left')
+            uncovered = int(np.count_nonzero(starts == ends))
+            if uncovered:
+                logger.warning(f"{symbol}: {uncovered}/{len(bar_ts)} bars have no 1m candles and will use close-based fills")
+            self.minutes[symbol] = minutes
+            self.index[symbol] = (bar_ts, starts, ends)
+        return self
+
+    "Returns the 1m rows that make up the bar opening at timestamp, or None if they are not available"
+    def _bar_minutes(self, symbol, timestamp):
+        if symbol not in self.index:
+            return None
+        bar_ts, starts, ends = self.index[symbol]
+        ts = _to_ms(timestamp)
+        pos = np.searchsorted(bar_ts, ts)
+        if pos >= len(bar_ts) or bar_ts[pos] != ts or starts[pos] == ends[pos]:
+            return None
+        return self.minutes[symbol][starts[pos]:ends[pos]]
+
+    "Returns (stop_loss or tp, minute) for whichever level the 1m candles from minute start onwards touched first, otherwise (close, None). Only bars whose range contains a level read 1m data, and a 1m candle spanning both levels fills the stop first"
+    def resolve_fill(self, symbol, timestamp, high, low, close, stop_loss, tp=None, start=0):
+        stop_in_range = high >= stop_loss
+        tp_in_range = tp is not None and low <= tp
+        if not stop_in_range and not tp_in_range:
+            return close, None
+
+        minutes = self._bar_minutes(symbol, timestamp)
+        if minutes is None or start >= len(minutes):
+            return close, None
+        minutes = minutes[start:]
+
+        stop_hits = np.flatnonzero(minutes[:, HIGH] >= stop_loss) if stop_in_range else np.empty(0, dtype=np.intp)
+        tp_hits = np.flatnonzero(minutes[:, LOW] <= tp) if tp_in_range else np.empty(0, dtype=np.intp)
+        first_stop = stop_hits[0] if len(stop_hits) else len(minutes)
+        first_tp = tp_hits[0] if len(tp_hits) else len(minutes)
+        if first_stop == len(minutes) and first_tp == len(minutes):
+            return close, None
+        if first_stop <= first_tp:
+            logger.debug(f"{symbol} - 1m fill: SL {stop_loss:.4f} touched first at minute {start + first_stop}")
+            return stop_loss, start + int(first_stop)
+        logger.debug(f"{symbol} - 1m fill: TP {tp:.4f} touched first at minute {start + first_tp}")
+        return tp, start + int(first_tp)
+
+    "Returns stop_loss or tp, whichever the 1m candles touched first, otherwise close"
+    def fill_price(self, symbol, timestamp, high, low, close, stop_loss, tp=None):
+        return self.resolve_fill(symbol, timestamp, high, low, close, stop_loss, tp)[0]
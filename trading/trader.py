@@ -4,7 +4,7 @@ from utils.logging import logger
 import pandas_ta as ta
 
 "Finds favourable short-selling opportunities to enter a trade as well as manages active trades and performs calculations"
-def apply_smc_strategy(current_data_dict, top_symbols, symbol, initial_balance, active_trade=None):
+def apply_smc_strategy(current_data_dict, top_symbols, symbol, initial_balance, active_trade=None, fill_model=None):
     balance = initial_balance
     trade_history = []
     equity_curve = [balance]
@@ -16,7 +16,8 @@ def apply_smc_strategy(current_data_dict, top_symbols, symbol, initial_balance,
         timestamp = current_data['timestamp'].iloc[-1]
         balance, active_trade, trade_history = manage_trade(
             symbol, current_price, active_trade, balance, trade_history,
-            active_trade["entry_index"], len(current_data) - 1, timestamp
+            active_trade["entry_index"], len(current_data) - 1, timestamp,
+            current_data['high'].iloc[-1], current_data['low'].iloc[-1], fill_model
         )
         equity_curve.append(balance)
         return balance, active_trade, trade_history, equity_curve, symbol
@@ -91,7 +92,7 @@ def is_bearish_momentum(df):
     return df['close'].iloc[-1] < df['ema5'].iloc[-1]
 
 "Manages trades after they have been opened, ensures values are updated after timeouts, stop-losses and take profits"
-def manage_trade(symbol, current_price, trade, balance, trade_history, entry_index, current_index, timestamp):
+def manage_trade(symbol, current_price, trade, balance, trade_history, entry_index, current_index, timestamp, high=None, low=None, fill_model=None):
     if trade is None:
         return balance, None, trade_history
 
@@ -114,40 +115,47 @@ def manage_trade(symbol, current_price, trade, balance, trade_history, entry_ind
         trade_history.append({"type": "timeout", "profit_loss": net_profit, "symbol": symbol, "timestamp": timestamp})
         return balance, trade, trade_history
 
+    "Price the SL/TP checks are evaluated at: the close, or with a 1m fill model whichever of stop loss or next take profit was touched first inside the bar"
+    fill_price, fill_minute = current_price, None
+    if fill_model is not None and high is not None and low is not None:
+        next_tp = next((tp for i, tp in enumerate(tp_targets) if not trade["tp_hit"][i]), None)
+        fill_price, fill_minute = fill_model.resolve_fill(symbol, timestamp, high, low, current_price, stop_loss, next_tp)
+
     "If trade hit stop loss, close trade as a loss, return updated balance and trading history"
-    if current_price >= stop_loss:
-        profit_loss = (entry_price - stop_loss) * position_size
-        fee = position_size * current_price * CONFIG["fee"]
-        net_profit = profit_loss - fee - entry_fee
-        if balance + net_profit < 0:
-            net_profit = -balance
-        logger.info(f"❌ {symbol} - SL HIT at {current_price:.4f}, P/L: {profit_loss:.4f}, Fee: {fee:.4f}, Net: {net_profit:.4f}, Size: {position_size:.4f}")
-        balance += net_profit
-        trade_history.append({"type": "loss", "profit_loss": net_profit, "symbol": symbol, "timestamp": timestamp})
-        return balance, None, trade_history
+    if fill_price >= stop_loss:
+        return close_at_stop(symbol, trade, stop_loss, fill_price, balance, trade_history, timestamp)
 
     "If trade hit a take profit level that has not been hit before, close trade at a profit, return updated. balance and trading history"
     for i, tp in enumerate(tp_targets):
-            if not trade["tp_hit"][i] and current_price <= tp:
+            if not trade["tp_hit"][i] and fill_price <= tp:
                 trade["tp_hit"][i] = True
                 if i == 0:  # TP1: Move to breakeven
                     new_stop_loss = entry_price
-                    logger.debug(f"🏆 {symbol} - TP1 HIT at {current_price:.4f}, SL → Breakeven: {new_stop_loss:.4f}")
+                    logger.debug(f"🏆 {symbol} - TP1 HIT at {fill_price:.4f}, SL → Breakeven: {new_stop_loss:.4f}")
                     trade["stop_loss"] = new_stop_loss
                 elif i == 1:  # TP2: Trail to TP1
                     new_stop_loss = tp_targets[0]  # Lock TP1 profit
-                    logger.debug(f"🏆 {symbol} - TP2 HIT at {current_price:.4f}, SL → TP1: {new_stop_loss:.4f}")
+                    logger.debug(f"🏆 {symbol} - TP2 HIT at {fill_price:.4f}, SL → TP1: {new_stop_loss:.4f}")
                     trade["stop_loss"] = new_stop_loss
                 elif i == 2:  # TP3: Exit fully
                     profit_loss = (entry_price - tp) * position_size
-                    fee = position_size * current_price * CONFIG["fee"]
+                    fee = position_size * fill_price * CONFIG["fee"]
                     net_profit = profit_loss - fee - entry_fee
-                    logger.info(f"🏆 {symbol} - TP3 HIT at {current_price:.4f}, P/L: {profit_loss:.4f}, Net: {net_profit:.4f}")
+                    logger.info(f"🏆 {symbol} - TP3 HIT at {fill_price:.4f}, P/L: {profit_loss:.4f}, Net: {net_profit:.4f}")
                     balance += net_profit
                     trade_history.append({"type": "win", "profit_loss": net_profit, "symbol": symbol, "timestamp": timestamp})
                     return balance, None, trade_history
                 break  # Only handle one TP per candle
 
+    "A take profit moves the stop, so the rest of the bar is checked against the new stop to catch a reversal inside the same bar"
+    moved_stop = trade["stop_loss"]
+    if moved_stop != stop_loss:
+        stop_hit_later = fill_minute is not None and fill_model.resolve_fill(
+            symbol, timestamp, high, low, current_price, moved_stop, None, start=fill_minute + 1
+        )[1] is not None
+        if stop_hit_later or current_price >= moved_stop:
+            return close_at_stop(symbol, trade, moved_stop, moved_stop if stop_hit_later else current_price, balance, trade_history, timestamp)
+
     "If trade moves favourably adjust stop-loss to lock in profits"
     if trade["tp_hit"][1]:  # TP2 hit, trail tighter
             new_stop_loss = min(stop_loss, current_price * (1 + CONFIG["trailing_stop_percent"]))
@@ -156,4 +164,17 @@ def manage_trade(symbol, current_price, trade, balance, trade_history, entry_ind
                 trade["stop_loss"] = new_stop_loss
 
     "If none of the above are met, return balance and trade information and try again"
-    return balance, trade, trade_history
\ No newline at end of file
+    return balance, trade, trade_history
+
+"Closes trade at its stop loss as a loss, fees are charged at the price the stop filled at"
+def close_at_stop(symbol, trade, stop_loss, fill_price, balance, trade_history, timestamp):
+    position_size = trade["position_size"]
+    profit_loss = (trade["entry_price"] - stop_loss) * position_size
+    fee = position_size * fill_price * CONFIG["fee"]
+    net_profit = profit_loss - fee - trade.get("entry_fee", 0)
+    if balance + net_profit < 0:
+        net_profit = -balance
+    logger.info(f"❌ {symbol} - SL HIT at {fill_price:.4f}, P/L: {profit_loss:.4f}, Fee: {fee:.4f}, Net: {net_profit:.4f}, Size: {position_size:.4f}")
+    balance += net_profit
+    trade_history.append({"type": "loss", "profit_loss": net_profit, "symbol": symbol, "timestamp": timestamp})
+    return balance, None, trade_history
\ No newline at end of file
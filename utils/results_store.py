@@ -0,0 +1,194 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from config.config import RESULTS_DIR
+
+"Uses the root logger directly so importing this module does not reconfigure backtest.py's log file"
+logger = logging.getLogger()
+
+DB_FILENAME = "runs.sqlite"
+ARRAYS_DIRNAME = "arrays"
+
+"Summary metrics promoted to their own columns so they can be filtered and sorted on without reading the JSON blob"
+SUMMARY_COLUMNS = ["initial_balance", "final_balance", "profit", "total_trades", "wins", "losses", "timeouts", "win_rate", "max_drawdown"]
+CONFIG_COLUMNS = ["risk_percent", "trailing_stop_percent", "trade_timeout_candles"]
+SORTABLE_COLUMNS = set(SUMMARY_COLUMNS + CONFIG_COLUMNS + ["created_at", "start_ts", "end_ts"])
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_key TEXT PRIMARY KEY,
+    config_hash TEXT NOT NULL,
+    symbols TEXT NOT NULL,
+    start_ts TEXT NOT NULL,
+    end_ts TEXT NOT NULL,
+    source TEXT,
+    created_at TEXT NOT NULL,
+    config TEXT NOT NULL,
+    metrics TEXT NOT NULL,
+    {", ".join(f"{column} REAL" for column in SUMMARY_COLUMNS + CONFIG_COLUMNS)},
+    UNIQUE (config_hash, symbols, start_ts, end_ts)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_symbols_range ON runs (symbols, start_ts, end_ts);
+CREATE INDEX IF NOT EXISTS idx_runs_profit ON runs (profit);
+CREATE INDEX IF NOT EXISTS idx_runs_risk_profit ON runs (risk_percent, profit);
+"""
+
+"Converts numpy scalars and timestamps so summaries and configs can be stored as JSON"
+def _json_default(value):
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+"Hashes a run configuration, key order does not matter so identical configs always map to the same hash"
+def config_hash(config):
+    payload = json.dumps(config, sort_keys=True, default=_json_default)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+"Returns the symbol set and the date range covered by a dictionary of OHLCV tables"
+def run_index(historical_data):
+    frames = [df for df in historical_data.values() if df is not None and not df.empty]
+    symbols = ",".join(sorted(set(historical_data.keys())))
+    if not frames:
+        return symbols, "", ""
+    start = min(df['timestamp'].iloc[0] for df in frames)
+    end = max(df['timestamp'].iloc[-1] for df in frames)
+    return symbols, pd.Timestamp(start).isoformat(), pd.Timestamp(end).isoformat()
+
+"Builds the key a run is stored under from its config hash, symbol set and date range"
+def _run_key(config, historical_data):
+    symbols, start, end = run_index(historical_data)
+    key_hash = config_hash(config)
+    run_key = hashlib.sha1(f"{key_hash}|{symbols}|{start}|{end}".encode("utf-8")).hexdigest()
+    return run_key, key_hash, symbols, start, end
+
+"Opens the results database and creates the runs table and its indexes on first use"
+def _connect(results_dir):
+    os.makedirs(results_dir, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(results_dir, DB_FILENAME))
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+def _arrays_path(results_dir, run_key):
+    return os.path.join(results_dir, ARRAYS_DIRNAME, f"{run_key}.npz")
+
+"Writes the equity curve and trade ledger to an npz file, ledger columns are stored as plain arrays so loading never needs pickle, datetime columns as int64 ms"
+def _write_arrays(path, trades, equity_curve):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    ledger = pd.DataFrame(trades)
+    datetime_columns = [column for column in ledger.columns if pd.api.types.is_datetime64_any_dtype(ledger[column])]
+    arrays = {
+        "equity_curve": np.asarray(equity_curve, dtype=float),
+        "trade_columns": np.asarray(list(ledger.columns), dtype=str),
+        "datetime_columns": np.asarray(datetime_columns, dtype=str),
+    }
+    for column in ledger.columns:
+        values = ledger[column]
+        if column in datetime_columns:
+            arrays[f"trade__{column}"] = values.to_numpy(dtype='datetime64[ms]').astype(np.int64)
+        elif pd.api.types.is_numeric_dtype(values):
+            arrays[f"trade__{column}"] = values.to_numpy()
+        else:
+            arrays[f"trade__{column}"] = np.asarray(values.astype(str), dtype=str)
+    tmp_path = f"{path}.tmp.npz"
+    np.savez_compressed(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+def _read_arrays(path):
+    with np.load(path, allow_pickle=False) as arrays:
+        columns = [str(column) for column in arrays["trade_columns"]]
+        datetime_columns = {str(column) for column in arrays["datetime_columns"]} if "datetime_columns" in arrays else set()
+        trades = pd.DataFrame({column: arrays[f"trade__{column}"] for column in columns}, columns=columns)
+        for column in datetime_columns:
+            trades[column] = pd.to_datetime(trades[column], unit='ms')
+        equity_curve = arrays["equity_curve"].tolist()
+    return trades, equity_curve
+
+"Stores a finished run: config and summary metrics go into SQLite, trade ledger and equity curve into an npz file"
+def save_run(config, historical_data, summary, trades, equity_curve, source=None, results_dir=RESULTS_DIR):
+    run_key, key_hash, symbols, start, end = _run_key(config, historical_data)
+    _write_arrays(_arrays_path(results_dir, run_key), trades, equity_curve)
+
+    row = {
+        "run_key": run_key,
+        "config_hash": key_hash,
+        "symbols": symbols,
+        "start_ts": start,
+        "end_ts": end,
+        "source": source,
+        "created_at": datetime.now().isoformat(),
+        "config": json.dumps(config, sort_keys=True, default=_json_default),
+        "metrics": json.dumps(summary, default=_json_default),
+    }
+    for column in SUMMARY_COLUMNS:
+        row[column] = summary.get(column)
+    for column in CONFIG_COLUMNS:
+        row[column] = config.get(column)
+
+    columns = ", ".join(row.keys())
+    placeholders = ", ".join(f":{column}" for column in row.keys())
+    conn = _connect(results_dir)
+    try:
+        with conn:
+            conn.execute(f"INSERT OR REPLACE INTO runs ({columns}) VALUES ({placeholders})", row)
+    finally:
+        conn.close()
+    logger.info(f"Stored run {run_key[:12]} ({symbols}, {start} → {end})")
+    return run_key
+
+"Returns a previously stored run for an identical config, symbol set and date range, or None if it has not been run yet"
+def load_run(config, historical_data, results_dir=RESULTS_DIR):
+    run_key, _, _, _, _ = _run_key(config, historical_data)
+    path = _arrays_path(results_dir, run_key)
+    conn = _connect(results_dir)
+    try:
+        row = conn.execute("SELECT run_key, config, metrics FROM runs WHERE run_key = ?", (run_key,)).fetchone()
+    finally:
+        conn.close()
+    if row is None or not os.path.exists(path):
+        return None
+
+    trades, equity_curve = _read_arrays(path)
+    return {
+        "run_key": row["run_key"],
+        "config": json.loads(row["config"]),
+        "summary": json.loads(row["metrics"]),
+        "trades": trades,
+        "equity_curve": equity_curve,
+    }
+
+"Queries stored runs, e.g. top_runs(by='profit', limit=20, max_risk_percent=5), and returns the matching rows as a table"
+def top_runs(by="profit", limit=20, max_risk_percent=None, symbols=None, start=None, end=None, ascending=False, results_dir=RESULTS_DIR):
+    if by not in SORTABLE_COLUMNS:
+        raise ValueError(f"Cannot sort runs by {by!r}, expected one of {sorted(SORTABLE_COLUMNS)}")
+
+    clauses = []
+    params = []
+    if max_risk_percent is not None:
+        clauses.append("risk_percent <= ?")
+        params.append(max_risk_percent)
+    if symbols is not None:
+        clauses.append("symbols = ?")
+        params.append(",".join(sorted(set(symbols))))
+    if start is not None:
+        clauses.append("start_ts >= ?")
+        params.append(pd.Timestamp(start).isoformat())
+    if end is not None:
+        clauses.append("end_ts <= ?")
+        params.append(pd.Timestamp(end).isoformat())
+
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    order = "ASC" if ascending else "DESC"
+    query = f"SELECT * FROM runs {where} ORDER BY {by} {order} LIMIT ?"
+    params.append(int(limit))
+
+    conn = _connect(results_dir)
+    try:
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()